@@ -2,35 +2,81 @@ import threading
 import time
 import random
 import sys
-from typing import List, Optional
+import queue
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 # --- Zmienne Globalne i Zasoby ---
 NUM_PUMPS = 3  # Liczba dostępnych dystrybutorów
-PUMPS_SEMAPHORE = threading.Semaphore(NUM_PUMPS) # Semafor ograniczający dostęp do dystrybutorów
 CASHIER_LOCK = threading.Lock() # Blokada chroniąca dostęp do kasy
-CASHIER_BUSY = False # Stan kasy (dla prostszej symulacji blokady)
-VEHICLE_COUNT = 0 # Licznik pojazdów
-PRINT_LOCK = threading.Lock() # Blokada do synchronizacji wyświetlania na konsoli
+PUMP_STATUS_LOCK = threading.Lock() # Blokada chroniąca listę pump_status
+LOG_Q = queue.SimpleQueue() # Kolejka logów opróżniana przez jeden wątek piszący
 
-# Lista symulująca zajętość poszczególnych dystrybutorów
+# Lista symulująca zajętość poszczególnych dystrybutorów (tylko do wyświetlania)
 pump_status = [f"D{i+1}: Wolny" for i in range(NUM_PUMPS)]
 
+def station_status() -> str:
+    """Zwraca jednowierszowy opis stanu kasy i dystrybutorów."""
+    return f"Kasa: {'Zajęta' if CASHIER_LOCK.locked() else 'Wolna'} | " + " | ".join(pump_status)
+
+def make_free_pumps(n: int) -> queue.SimpleQueue:
+    """Tworzy kolejkę numerów wolnych dystrybutorów 1..n."""
+    free = queue.SimpleQueue()
+    for i in range(n):
+        free.put(i + 1)
+    return free
+
+# Kolejka wolnych dystrybutorów - ogranicza dostęp zamiast semafora
+FREE_PUMPS = make_free_pumps(NUM_PUMPS)
+
 def safe_print(*args, **kwargs):
-    """Funkcja do bezpiecznego wyświetlania logów, by uniknąć pomieszania tekstu."""
-    with PRINT_LOCK:
-        print(*args, **kwargs)
+    """Funkcja do bezpiecznego wyświetlania logów, by uniknąć pomieszania tekstu.
+
+    Wątki jedynie wrzucają gotową linię do LOG_Q - zapis na konsolę wykonuje
+    wyłącznie wątek _drain, więc producenci nie blokują się nawzajem na I/O.
+    """
+    sep = kwargs.get("sep", " ")
+    end = kwargs.get("end", "\n")
+    LOG_Q.put(sep.join(map(str, args)) + end)
+
+def _drain():
+    """Jedyny wątek piszący na stdout - opróżnia LOG_Q aż do otrzymania None."""
+    while True:
+        line = LOG_Q.get()
+        if line is None:
+            break
+        sys.stdout.write(line)
+
+def _stop_drain():
+    """Przy zamykaniu programu wypisuje zaległe logi i kończy wątek piszący."""
+    LOG_Q.put(None)
+    _LOG_WRITER.join(timeout=1)
+
+_LOG_WRITER = threading.Thread(target=_drain, daemon=True)
+_LOG_WRITER.start()
+atexit.register(_stop_drain)
+
+_tls = threading.local() # Dane lokalne wątku (własny generator liczb losowych)
+
+def _rng() -> random.Random:
+    """Zwraca generator liczb losowych należący do bieżącego wątku."""
+    rng = getattr(_tls, "rng", None)
+    if rng is None:
+        rng = _tls.rng = random.Random()
+    return rng
 
 # --- Klasy Zasobów i Wątków ---
 
 class Pump:
-    """Reprezentacja Dystrybutora - chroniony przez Semafor."""
+    """Reprezentacja Dystrybutora - przydzielany z kolejki FREE_PUMPS."""
     def __init__(self, id: int):
         self.id = id
         
     def tank(self, vehicle_id: int):
         """Symuluje proces tankowania."""
         safe_print(f"🚗 Pojazd {vehicle_id} tankuje na Dystrybutorze D{self.id}...")
-        tank_time = random.uniform(3, 7)
+        tank_time = _rng().uniform(3, 7)
         time.sleep(tank_time)
         safe_print(f"✅ Pojazd {vehicle_id} zakończył tankowanie (czas: {tank_time:.2f}s).")
 
@@ -38,110 +84,134 @@ class Cashier:
     """Reprezentacja Kasy - chroniony przez Blokadę Mutex."""
     def process_payment(self, vehicle_id: int):
         """Symuluje proces płatności."""
-        global CASHIER_BUSY
-        
         safe_print(f"💰 Pojazd {vehicle_id} czeka na kasę...")
         
         with CASHIER_LOCK: # SEKCJA KRYTYCZNA: Dostęp do kasy
-            CASHIER_BUSY = True
             safe_print(f"💳 Pojazd {vehicle_id} płaci w kasie. Kasa zajęta...")
             
-            payment_time = random.uniform(1, 3)
+            payment_time = _rng().uniform(1, 3)
             time.sleep(payment_time)
             
             safe_print(f"🎉 Pojazd {vehicle_id} zapłacił i opuszcza stację (czas: {payment_time:.2f}s).")
-            CASHIER_BUSY = False # Zwolnienie kasy
 
-class Vehicle(threading.Thread):
-    """Wątek Użytkowy: Symulacja Pojazdu."""
-    def __init__(self, id: int, pumps: List[Pump], cashier: Cashier):
-        super().__init__()
-        self.id = id
-        self.pumps = pumps
-        self.cashier = cashier
+def leave_station(id: int, cashier: Cashier):
+    """Zadanie Kasowe: płatność i wyjazd pojazdu (wykonywane w jednowątkowej puli kasy)."""
+    cashier.process_payment(id)
+    safe_print(f"👋 Pojazd {id} opuścił stację.")
+
+def simulate_vehicle(id: int, pumps: Dict[int, Pump], cashier: Cashier,
+                     payments: ThreadPoolExecutor) -> Optional[Future]:
+    """Zadanie Użytkowe: Tankowanie pojazdu (wykonywane w puli dystrybutorów).
+
+    Po zwolnieniu dystrybutora płatność trafia do puli kasy, więc wątek
+    dystrybutora od razu obsługuje kolejny pojazd. Zwraca Future płatności.
+    """
+    # 1. Zdobądź wolny dystrybutor
+    pump_id = FREE_PUMPS.get()
+    with PUMP_STATUS_LOCK: # Synchronizacja dostępu do statusu
+        pump_status[pump_id - 1] = f"D{pump_id}: Zajęty przez V{id}"
+
+    # 2. Tankowanie
+    selected_pump = pumps.get(pump_id)
+    if selected_pump:
+        selected_pump.tank(id)
         
-    def run(self):
-        safe_print(f"🚘 Pojazd {self.id} przybył na stację i czeka na dystrybutor...")
-
-        # 1. Zdobądź dostęp do dystrybutora (Semafor)
-        PUMPS_SEMAPHORE.acquire()
+        # Zwolnij dystrybutor
+        with PUMP_STATUS_LOCK:
+            pump_status[pump_id - 1] = f"D{pump_id}: Wolny (zwolniony przez V{id})"
         
-        # Znajdź wolny dystrybutor
-        pump_id = -1
-        for i in range(NUM_PUMPS):
-            with PRINT_LOCK: # Synchronizacja dostępu do statusu
-                if pump_status[i].endswith("Wolny"):
-                    pump_status[i] = f"D{i+1}: Zajęty przez V{self.id}"
-                    pump_id = i + 1
-                    break
+        FREE_PUMPS.put(pump_id)
         
-        # Symulacja Race Condition: Dwa wątki mogą wejść do tego bloku,
-        # zanim pump_status zostanie zaktualizowany, jeśli nie użyjemy blokady (ale używamy PRINT_LOCK).
-        # Użycie Semfora jest głównym mechanizmem kontroli.
-
-        # 2. Tankowanie
-        selected_pump = next((p for p in self.pumps if p.id == pump_id), None)
-        if selected_pump:
-            selected_pump.tank(self.id)
-            
-            # Zwolnij dystrybutor
-            with PRINT_LOCK:
-                pump_status[pump_id - 1] = f"D{pump_id}: Wolny (zwolniony przez V{self.id})"
-            
-            PUMPS_SEMAPHORE.release()
-            
-            # 3. Płatność
-            self.cashier.process_payment(self.id)
-            safe_print(f"👋 Pojazd {self.id} opuścił stację.")
-        else:
-             # Zdarzenie awaryjne - nie powinno się zdarzyć
-             safe_print(f"❌ Błąd: Pojazd {self.id} nie znalazł dystrybutora po acquire!")
-             PUMPS_SEMAPHORE.release()
+        # 3. Płatność
+        try:
+            return payments.submit(leave_station, id, cashier)
+        except RuntimeError:
+            # Interpreter się zamyka - zapłać bezpośrednio w tym wątku
+            leave_station(id, cashier)
+    else:
+        # Zdarzenie awaryjne - nie powinno się zdarzyć
+        safe_print(f"❌ Błąd: Pojazd {id} nie znalazł dystrybutora D{pump_id}!")
+        FREE_PUMPS.put(pump_id)
+    return None
 
 
 class StationManager(threading.Thread):
     """Wątek Zarządzający/Monitorujący: Generuje pojazdy i wyświetla stan."""
-    def __init__(self, pumps: List[Pump], cashier: Cashier, max_vehicles: int = 10):
+    def __init__(self, pumps: List[Pump], cashier: Cashier, max_vehicles: int = 10,
+                 status_interval: Optional[float] = None):
         super().__init__()
-        self.pumps = pumps
+        self.pumps = {p.id: p for p in pumps} # Dystrybutory według numeru
         self.cashier = cashier
         self.max_vehicles = max_vehicles
-        self.running = True
+        # Sygnał zatrzymania - przerywa również oczekiwanie na kolejny pojazd
+        self._stop_event = threading.Event()
+        self.vehicle_count = 0 # Liczba wygenerowanych pojazdów (zapisywana tylko przez ten wątek)
+        self._rng = random.Random()
+        # Co ile sekund wyświetlać stan stacji (None - stan odczytuje np. GUI)
+        self.status_interval = status_interval
+        self._status_stop = threading.Event()
+        self._status_thread: Optional[threading.Thread] = None
         
     def run(self):
-        global VEHICLE_COUNT
-        vehicle_threads = []
+        # Pula o rozmiarze liczby dystrybutorów - jej kolejka zadań to kolejka pojazdów.
+        # Płatności obsługuje osobna jednowątkowa pula kasy (i tak szeregowana przez CASHIER_LOCK).
+        pool = ThreadPoolExecutor(max_workers=len(self.pumps))
+        payments = ThreadPoolExecutor(max_workers=1)
+        futures = []
         
         safe_print("\n--- ⛽ START SYMULACJI STACJI BENZYNOWEJ ---")
 
-        while VEHICLE_COUNT < self.max_vehicles and self.running:
+        # Monitorowanie stanu na osobnym zegarze, poza pętlą generowania pojazdów
+        if self.status_interval:
+            self._status_thread = threading.Thread(target=self._status_loop, daemon=True)
+            self._status_thread.start()
+
+        while self.vehicle_count < self.max_vehicles and not self._stop_event.is_set():
             # 1. Generuj nowy pojazd
-            time.sleep(random.uniform(1, 3))
-            VEHICLE_COUNT += 1
-            vehicle = Vehicle(VEHICLE_COUNT, self.pumps, self.cashier)
-            vehicle_threads.append(vehicle)
-            vehicle.start()
-            
-            # 2. Wyświetlaj stan (monitorowanie)
-            self.display_status()
+            if self._stop_event.wait(self._rng.uniform(1, 3)):
+                break
+            vid = self.vehicle_count + 1
+            try:
+                futures.append(pool.submit(simulate_vehicle, vid, self.pumps, self.cashier, payments))
+            except RuntimeError:
+                # Interpreter się zamyka (np. zamknięto okno GUI) - nie przyjmujemy nowych pojazdów
+                break
+            safe_print(f"🚘 Pojazd {vid} przybył na stację i czeka na dystrybutor...")
+            self.vehicle_count += 1
             
         safe_print("\n--- Zatrzymywanie generatora pojazdów. Oczekiwanie na zakończenie wszystkich wątków... ---")
         
-        # Oczekiwanie na zakończenie wątków pojazdów
-        for t in vehicle_threads:
-            t.join()
+        # Oczekiwanie na zakończenie tankowania, a potem wszystkich płatności
+        pool.shutdown(wait=True)
+        paid = []
+        for f in futures:
+            if f.exception() is not None:
+                safe_print(f"❌ Błąd pojazdu: {f.exception()!r}")
+            elif f.result() is not None:
+                paid.append(f.result())
+        payments.shutdown(wait=True)
+        for f in paid:
+            if f.exception() is not None:
+                safe_print(f"❌ Błąd płatności: {f.exception()!r}")
+
+        self._status_stop.set()
+        if self._status_thread is not None:
+            self._status_thread.join()
             
         safe_print("--- ✅ SYMULACJA ZAKOŃCZONA ---")
 
 
+    def _status_loop(self):
+        """Wyświetla stan co status_interval sekund, aż do ustawienia _status_stop."""
+        while not self._status_stop.wait(self.status_interval):
+            self.display_status()
+
     def display_status(self):
         """Wyświetla aktualny stan stacji."""
-        status_line = f"\n[STAN STACJI] | Kasa: {'Zajęta' if CASHIER_LOCK.locked() else 'Wolna'} | "
-        status_line += " | ".join(pump_status)
-        safe_print(status_line)
+        safe_print(f"\n[STAN STACJI] | {station_status()}")
         
     def stop(self):
-        self.running = False
+        self._stop_event.set()
 
 
 # --- Główna funkcja wykonawcza ---
@@ -152,7 +222,7 @@ if __name__ == "__main__":
     the_cashier = Cashier()
     
     # Uruchom Menedżera Stacji (Wątek Zarządzający)
-    manager = StationManager(all_pumps, the_cashier, max_vehicles=10) # Symulacja 10 pojazdów
+    manager = StationManager(all_pumps, the_cashier, max_vehicles=10, status_interval=0.5) # Symulacja 10 pojazdów
     manager.start()
     
     # Czekaj na zakończenie Menedżera (a on czeka na pojazdy)
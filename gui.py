@@ -1,18 +1,23 @@
 import threading
-import queue
+import collections
 import tkinter as tk
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 
 import Project as project
 
+# Max lines waiting for the log widget before new ones are dropped
+LOG_QUEUE_WATERMARK = 10_000
+
 
 class StationGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Gas Station Simulator - Simple GUI")
 
-        self.log_queue = queue.Queue()
+        self.log_queue = collections.deque()
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
         self.orig_safe_print = project.safe_print
 
         # Controls frame
@@ -21,11 +26,14 @@ class StationGUI:
 
         ttk.Label(frm, text="Number of pumps:").grid(row=0, column=0, sticky="w")
         self.pumps_var = tk.IntVar(value=getattr(project, 'NUM_PUMPS', 3))
-        ttk.Entry(frm, textvariable=self.pumps_var, width=6).grid(row=0, column=1, sticky="w")
+        pumps_entry = ttk.Entry(frm, textvariable=self.pumps_var, width=6)
+        pumps_entry.grid(row=0, column=1, sticky="w")
 
         ttk.Label(frm, text="Max vehicles:").grid(row=0, column=2, sticky="w", padx=(10,0))
         self.max_var = tk.IntVar(value=10)
-        ttk.Entry(frm, textvariable=self.max_var, width=6).grid(row=0, column=3, sticky="w")
+        max_entry = ttk.Entry(frm, textvariable=self.max_var, width=6)
+        max_entry.grid(row=0, column=3, sticky="w")
+        self._entries = (pumps_entry, max_entry)
 
         self.start_btn = ttk.Button(frm, text="Start", command=self.start_simulation)
         self.start_btn.grid(row=0, column=4, padx=(10,0))
@@ -44,8 +52,13 @@ class StationGUI:
         self.progress = ttk.Progressbar(frm, length=320, mode='determinate')
         self.progress.grid(row=1, column=3, columnspan=4, sticky="w", padx=(10,0), pady=(6,0))
 
+        ttk.Label(frm, text="Station:").grid(row=2, column=0, sticky="w", pady=(6,0))
+        self.station_var = tk.StringVar(value="")
+        ttk.Label(frm, textvariable=self.station_var).grid(row=2, column=1, columnspan=6, sticky="w", pady=(6,0))
+
         # Log area
-        self.log = ScrolledText(root, height=20, width=100, state="disabled")
+        self.log = ScrolledText(root, height=20, width=100, state="disabled",
+                                undo=False, autoseparators=False, maxundo=0)
         self.log.grid(row=2, column=0, padx=10, pady=(0,10), sticky="nsew")
 
         root.rowconfigure(2, weight=1)
@@ -53,52 +66,57 @@ class StationGUI:
 
         self.manager = None
         self.updater_running = False
+        # Set once in start_simulation; _poll_status only reads it
+        self._max_veh = None
 
         # Start polling queue
         self.root.after(100, self.poll_log)
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
     def gui_safe_print(self, *args, **kwargs):
-        text = " ".join(str(a) for a in args)
-        self.log_queue.put(text)
-        # still keep original console output
-        try:
-            self.orig_safe_print(*args, **kwargs)
-        except Exception:
-            pass
+        # Back-pressure: past the watermark count lines instead of queueing them
+        if len(self.log_queue) > LOG_QUEUE_WATERMARK:
+            with self._dropped_lock:
+                self._dropped += 1
+            return
+        self.log_queue.append(" ".join(map(str, args)))
 
     def poll_log(self):
-        try:
-            while True:
-                line = self.log_queue.get_nowait()
-                self.log.configure(state="normal")
-                self.log.insert("end", line + "\n")
+        # Drain everything queued since the last tick and insert it in one call
+        lines = []
+        while True:
+            try:
+                lines.append(self.log_queue.popleft())
+            except IndexError:
+                break
+        if self._dropped:
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            lines.append(f"... ({dropped} lines dropped) ...")
+        if lines:
+            # Only follow the tail if the user hasn't scrolled up
+            at_bottom = self.log.yview()[1] > 0.99
+            self.log.configure(state="normal")
+            self.log.insert("end", "\n".join(lines) + "\n")
+            if at_bottom:
                 self.log.see("end")
-                self.log.configure(state="disabled")
-        except queue.Empty:
-            pass
-        # Update status and progress
-        try:
-            if self.manager and self.manager.is_alive():
-                max_veh = getattr(self.manager, 'max_vehicles', None)
-                current = getattr(project, 'VEHICLE_COUNT', 0)
-                if max_veh:
-                    # configure progress bar maximum and value
-                    try:
-                        self.progress.configure(maximum=max_veh)
-                        self.progress['value'] = current
-                    except Exception:
-                        pass
-                    self.status_var.set(f"Running ({current}/{max_veh})")
-                else:
-                    self.status_var.set("Running")
-            else:
-                # not running
-                self.status_var.set("Stopped")
-        except Exception:
-            pass
-
+            self.log.configure(state="disabled")
         self.root.after(100, self.poll_log)
 
+    def _poll_status(self, mgr):
+        # Scheduled by start_simulation; reschedules itself only while mgr runs
+        alive = mgr.is_alive()
+        current = mgr.vehicle_count
+        self.progress['value'] = current
+        self.station_var.set(project.station_status())
+        if not alive:
+            # Final update above shows the end state of the run
+            self.status_var.set("Stopped")
+            return
+        self.status_var.set(f"Running ({current}/{self._max_veh})")
+        self.root.after(100, self._poll_status, mgr)
+
     def clear_log(self):
         self.log.configure(state="normal")
         self.log.delete("1.0", "end")
@@ -113,9 +131,8 @@ class StationGUI:
 
         # Patch module-level globals to match GUI settings
         project.NUM_PUMPS = n_pumps
-        project.PUMPS_SEMAPHORE = threading.Semaphore(n_pumps)
+        project.FREE_PUMPS = project.make_free_pumps(n_pumps)
         project.pump_status = [f"D{i+1}: Wolny" for i in range(n_pumps)]
-        project.VEHICLE_COUNT = 0
 
         # Replace safe_print with GUI-aware function
         project.safe_print = self.gui_safe_print
@@ -123,22 +140,28 @@ class StationGUI:
         pumps = [project.Pump(i + 1) for i in range(n_pumps)]
         cashier = project.Cashier()
 
+        self._max_veh = max_veh
+
+        self.progress.configure(maximum=max_veh)
+        self.progress['value'] = 0
+
         self.manager = project.StationManager(pumps, cashier, max_vehicles=max_veh)
         self.manager.start()
+        self.root.after(100, self._poll_status, self.manager)
         # disable controls while running
         self.start_btn.configure(state="disabled")
         self.stop_btn.configure(state="enabled")
         self.clear_btn.configure(state="disabled")
         # disable inputs
-        for w in (self.pumps_var, self.max_var):
-            pass
-        try:
-            # Attempt to disable entry widgets by walking children of frm
-            for child in self.root.winfo_children()[0].winfo_children():
-                if isinstance(child, ttk.Entry):
-                    child.configure(state="disabled")
-        except Exception:
-            pass
+        for e in self._entries:
+            e.configure(state="disabled")
+
+    def on_close(self):
+        # Stop spawning before the window goes away; running vehicles finish on the console
+        if self.manager:
+            self.manager.stop()
+        project.safe_print = self.orig_safe_print
+        self.root.destroy()
 
     def stop_simulation(self):
         if not self.manager:
@@ -160,12 +183,8 @@ class StationGUI:
                 self.start_btn.configure(state="enabled")
                 self.stop_btn.configure(state="disabled")
                 self.clear_btn.configure(state="enabled")
-                try:
-                    for child in self.root.winfo_children()[0].winfo_children():
-                        if isinstance(child, ttk.Entry):
-                            child.configure(state="normal")
-                except Exception:
-                    pass
+                for e in self._entries:
+                    e.configure(state="normal")
                 self.manager = None
 
             self.root.after(0, finish)